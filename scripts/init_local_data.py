@@ -1,9 +1,9 @@
 # scripts/init_local_data.py
 from __future__ import annotations
 
+import functools
+
 from pathlib import Path
-from datetime import datetime
-import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
@@ -11,93 +11,97 @@ import pyarrow.parquet as pq
 BASE = Path("local_data")
 
 # ---- 2) Schemas (align with your earlier Postgres columns) ----
-SCHEMAS: dict[str, pa.schema] = {
-    "location": pa.schema(
-        [
-            ("name", pa.string()),
-            ("latitude", pa.float64()),
-            ("longitude", pa.float64()),
-            ("series_id", pa.string()),
-            ("nws_id", pa.string()),
-            ("tz", pa.string()),
-            ("weather_id", pa.string()),
-        ]
-    ),
-    # Facts (wide-open minimal schemas; add columns as you go)
-    "observation": pa.schema(
-        [
-            ("city", pa.string()),
-            ("station_id", pa.string()),
-            ("valid_time_utc", pa.timestamp("us")),
-            ("as_of_time_utc", pa.timestamp("us")),
-            ("temp_c", pa.float64()),
-            ("quality_flag", pa.string()),
-            ("provider", pa.string()),
-            ("prov_hash", pa.string()),
-            ("raw_payload", pa.string()),
-        ]
-    ),
-    "forecast": pa.schema(
-        [
-            ("city", pa.string()),
-            ("provider", pa.string()),
-            ("issue_time_utc", pa.timestamp("us")),
-            ("valid_time_utc", pa.timestamp("us")),
-            ("lead_hours", pa.int16()),
-            ("temp_c", pa.float64()),
-            ("model_run", pa.string()),
-            ("as_of_time_utc", pa.timestamp("us")),
-            ("prov_hash", pa.string()),
-            ("raw_payload", pa.string()),
-        ]
-    ),
-    "quote": pa.schema(
-        [
-            ("market_id", pa.string()),
-            ("ts_utc", pa.timestamp("us")),
-            ("side", pa.string()),  # 'bid'/'ask'
-            ("price", pa.decimal128(8, 2)),
-            ("size", pa.int32()),
-            ("book_level", pa.int16()),
-        ]
-    ),
-    "order": pa.schema(
-        [
-            ("account_id", pa.string()),
-            ("market_id", pa.string()),
-            ("ts_utc", pa.timestamp("us")),
-            ("side", pa.string()),        # 'buy'/'sell'
-            ("order_type", pa.string()),  # 'limit'/'market'
-            ("price_limit", pa.decimal128(8, 2)),
-            ("size", pa.int32()),
-            ("time_in_force", pa.string()),
-            ("decision_id", pa.string()),
-        ]
-    ),
-    "execution": pa.schema(
-        [
-            ("account_id", pa.string()),
-            ("broker_order_id", pa.string()),
-            ("market_id", pa.string()),
-            ("ts_utc", pa.timestamp("us")),
-            ("side", pa.string()),
-            ("price", pa.decimal128(8, 2)),
-            ("size", pa.int32()),
-            ("fee_usd", pa.decimal128(10, 2)),
-            ("raw_payload", pa.string()),
-        ]
-    ),
-    "cash_ledger": pa.schema(
-        [
-            ("account_id", pa.string()),
-            ("ts_utc", pa.timestamp("us")),
-            ("amount_usd", pa.decimal128(14, 2)),
-            ("reason", pa.string()),
-            ("ref_id", pa.string()),
-            ("meta", pa.string()),
-        ]
-    ),
-}
+@functools.cache
+def schemas() -> dict[str, pa.schema]:
+    # Built on first use and shared afterwards
+    return {
+        "location": pa.schema(
+            [
+                ("name", pa.string()),
+                ("latitude", pa.float64()),
+                ("longitude", pa.float64()),
+                ("series_id", pa.string()),
+                ("nws_id", pa.string()),
+                ("tz", pa.string()),
+                ("weather_id", pa.string()),
+            ]
+        ),
+        # Facts (wide-open minimal schemas; add columns as you go)
+        "observation": pa.schema(
+            [
+                ("city", pa.string()),
+                ("station_id", pa.string()),
+                ("valid_time_utc", pa.timestamp("us")),
+                ("as_of_time_utc", pa.timestamp("us")),
+                ("temp_c", pa.float64()),
+                ("quality_flag", pa.string()),
+                ("provider", pa.string()),
+                ("prov_hash", pa.string()),
+                ("raw_payload", pa.string()),
+            ]
+        ),
+        "forecast": pa.schema(
+            [
+                ("city", pa.string()),
+                ("provider", pa.string()),
+                ("issue_time_utc", pa.timestamp("us")),
+                ("valid_time_utc", pa.timestamp("us")),
+                ("lead_hours", pa.int16()),
+                ("temp_c", pa.float64()),
+                ("model_run", pa.string()),
+                ("as_of_time_utc", pa.timestamp("us")),
+                ("prov_hash", pa.string()),
+                ("raw_payload", pa.string()),
+            ]
+        ),
+        "quote": pa.schema(
+            [
+                ("market_id", pa.string()),
+                ("ts_utc", pa.timestamp("us")),
+                ("side", pa.string()),  # 'bid'/'ask'
+                ("price", pa.decimal128(8, 2)),
+                ("size", pa.int32()),
+                ("book_level", pa.int16()),
+            ]
+        ),
+        "order": pa.schema(
+            [
+                ("account_id", pa.string()),
+                ("market_id", pa.string()),
+                ("ts_utc", pa.timestamp("us")),
+                ("side", pa.string()),        # 'buy'/'sell'
+                ("order_type", pa.string()),  # 'limit'/'market'
+                ("price_limit", pa.decimal128(8, 2)),
+                ("size", pa.int32()),
+                ("time_in_force", pa.string()),
+                ("decision_id", pa.string()),
+            ]
+        ),
+        "execution": pa.schema(
+            [
+                ("account_id", pa.string()),
+                ("broker_order_id", pa.string()),
+                ("market_id", pa.string()),
+                ("ts_utc", pa.timestamp("us")),
+                ("side", pa.string()),
+                ("price", pa.decimal128(8, 2)),
+                ("size", pa.int32()),
+                ("fee_usd", pa.decimal128(10, 2)),
+                ("raw_payload", pa.string()),
+            ]
+        ),
+        "cash_ledger": pa.schema(
+            [
+                ("account_id", pa.string()),
+                ("ts_utc", pa.timestamp("us")),
+                ("amount_usd", pa.decimal128(14, 2)),
+                ("reason", pa.string()),
+                ("ref_id", pa.string()),
+                ("meta", pa.string()),
+            ]
+        ),
+    }
+
 
 # ---- 3) Minimal Location registry (from your mapping) ----
 CITIES = {
@@ -177,33 +181,53 @@ def _ensure_dirs() -> None:
 def _write_empty_if_missing(file: Path, schema: pa.schema) -> None:
     if file.exists():
         return
-    empty = pa.Table.from_arrays([pa.array([], type=f.type) for f in schema], names=[f.name for f in schema])
-    pq.write_table(empty, file)
+    pq.write_table(
+        schema.empty_table(),
+        file,
+        compression="zstd",
+        compression_level=3,
+        write_statistics=False,
+    )
+
+
+def _seed_accuweather_location_keys() -> None:
+    # Resolve AccuWeather location keys once so scheduled runs skip the lookup
+    from galton.data_collection.accuweather import AccuWeatherClient, AccuWeatherError
+
+    try:
+        client = AccuWeatherClient(
+            location_key_cache_path=BASE / "accuweather_location_keys.json"
+        )
+        client.seed_location_keys(CITIES)
+    except AccuWeatherError as exc:
+        print(f"Skipping AccuWeather location key seed: {exc}")
 
 
 def init() -> None:
     _ensure_dirs()
 
     # Create empty dims if missing
-    _write_empty_if_missing(BASE / "dim_location.parquet", SCHEMAS["dim_location"])
-    _write_empty_if_missing(BASE / "dim_market_contract.parquet", SCHEMAS["dim_market_contract"])
+    _write_empty_if_missing(BASE / "dim_location.parquet", schemas()["location"])
+    # No market contract schema is defined yet, so that dim waits until one is
+    market_contract = schemas().get("market_contract")
+    if market_contract is not None:
+        _write_empty_if_missing(BASE / "dim_market_contract.parquet", market_contract)
 
     # Seed dim_location from CITIES (overwrite for idempotency)
-    rows = []
-    for name, v in CITIES.items():
-        rows.append(
-            {
-                "name": name,
-                "latitude": v["latitude"],
-                "longitude": v["longitude"],
-                "series_id": v["series_id"],
-                "nws_id": v["nws_id"],
-                "tz": v["tz"],
-                "weather_id": v["weather_id"],
-            }
+    schema = schemas()["location"]
+    names = list(CITIES)
+    cols = {"name": pa.array(names, type=schema.field("name").type)}
+    for fname in ("latitude", "longitude", "series_id", "nws_id", "tz", "weather_id"):
+        cols[fname] = pa.array(
+            [CITIES[n][fname] for n in names], type=schema.field(fname).type
         )
-    df = pd.DataFrame(rows, columns=[f.name for f in SCHEMAS["dim_location"]])
-    pq.write_table(pa.Table.from_pandas(df, schema=SCHEMAS["dim_location"]), BASE / "dim_location.parquet")
+    pq.write_table(
+        pa.Table.from_pydict(cols, schema=schema),
+        BASE / "dim_location.parquet",
+        compression="zstd",
+    )
+
+    _seed_accuweather_location_keys()
 
     print(f"Initialized local_data at {BASE.resolve()}")
 
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime, timezone
 from pathlib import Path
 
+import json
+import numpy as np
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import re
 import requests
-import time
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 try:
@@ -18,6 +26,12 @@ try:
 except Exception:  # pragma: no cover
     load_dotenv = None
 
+try:
+    # Optional: faster JSON parsing if orjson is installed.
+    from orjson import loads as _json_loads
+except Exception:  # pragma: no cover
+    _json_loads = json.loads
+
 
 # ---- Your city reference (expects city_reference.py on PYTHONPATH) ----------
 # city_reference.py contains:
@@ -33,11 +47,101 @@ else:
 
 ACCU_BASE = "https://dataservice.accuweather.com"
 
+# Cities are fetched concurrently; keep the pool at least as large as the
+# number of workers so connections are reused instead of discarded.
+MAX_WORKERS = 8
+POOL_SIZE = 16
+
+# Rows per parquet row group when writing the staged dataset
+ROWS_PER_GROUP = 8192
+
+# City coords -> location_key never changes, so it is persisted between runs.
+LOCATION_KEY_CACHE_PATH = Path("local_data/accuweather_location_keys.json")
+
 
 class AccuWeatherError(RuntimeError):
     pass
 
 
+# ---- Hourly payload -> columns -----------------------------------------------
+def _value_unit() -> pa.DataType:
+    return pa.struct([("Value", pa.float64()), ("Unit", pa.string())])
+
+
+# Only the fields listed here are read from each hourly record
+_HOURLY_SCHEMA = pa.schema(
+    [
+        ("EpochDateTime", pa.int64()),
+        ("Temperature", _value_unit()),
+        ("RealFeelTemperature", _value_unit()),
+        ("IconPhrase", pa.string()),
+        ("HasPrecipitation", pa.bool_()),
+        ("PrecipitationProbability", pa.int64()),
+        (
+            "Wind",
+            pa.struct(
+                [
+                    ("Speed", _value_unit()),
+                    ("Direction", pa.struct([("Localized", pa.string())])),
+                ]
+            ),
+        ),
+        ("RelativeHumidity", pa.int64()),
+        ("UVIndex", pa.int64()),
+    ]
+)
+
+# (output column, flattened column in _HOURLY_SCHEMA)
+_ACCU_FIELDS: List[Tuple[str, str]] = [
+    ("datetime", "EpochDateTime"),
+    ("temp", "Temperature.Value"),
+    ("temp_unit", "Temperature.Unit"),
+    ("realfeel", "RealFeelTemperature.Value"),
+    ("realfeel_unit", "RealFeelTemperature.Unit"),
+    ("phrase", "IconPhrase"),
+    ("has_precip", "HasPrecipitation"),
+    ("precip_prob", "PrecipitationProbability"),
+    ("wind_speed", "Wind.Speed.Value"),
+    ("wind_unit", "Wind.Speed.Unit"),
+    ("wind_dir", "Wind.Direction.Localized"),
+    ("rh", "RelativeHumidity"),
+    ("uv_index", "UVIndex"),
+]
+
+
+_F_SCALE = np.float64(9.0 / 5.0)
+_F_OFF = np.float64(32.0)
+
+
+def _celsius_to_fahrenheit(temp: Union["pd.Series", pa.ChunkedArray]) -> np.ndarray:
+    t = np.asarray(temp, dtype=np.float64)
+    out = np.empty_like(t)
+    np.multiply(t, _F_SCALE, out=out)
+    np.add(out, _F_OFF, out=out)
+    return out
+
+
+def _normalize_hourly(payload: List[Dict[str, Any]]) -> pa.Table:
+    """
+    Build an Arrow table from the hourly JSON records in one typed pass
+    (no dtype inference), then flatten the nested structs and rename.
+    """
+    table = pa.Table.from_pylist(payload, schema=_HOURLY_SCHEMA)
+    while any(pa.types.is_struct(f.type) for f in table.schema):
+        table = table.flatten()
+
+    table = table.select([col for _, col in _ACCU_FIELDS])
+    table = table.rename_columns([name for name, _ in _ACCU_FIELDS])
+
+    # Epoch seconds -> UTC timestamps (same instant as the 'DateTime' string)
+    datetimes = table.column("datetime").cast(pa.timestamp("s", "UTC"))
+    return table.set_column(
+        table.schema.get_field_index("datetime"),
+        "datetime",
+        datetimes.cast(pa.timestamp("us", "UTC")),
+    )
+
+
 @dataclass
 class AccuWeatherClient:
     """
@@ -49,6 +153,14 @@ class AccuWeatherClient:
     api_key: Optional[str] = None
     session: Optional[requests.Session] = None
     timeout: Tuple[float, float] = (10.0, 30.0)  # (connect, read)
+    location_key_cache_path: Path = LOCATION_KEY_CACHE_PATH
+
+    _location_key_cache: Optional[Dict[Tuple[float, float], str]] = field(
+        default=None, init=False, repr=False
+    )
+    _location_key_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         if self.api_key is None:
@@ -63,30 +175,45 @@ class AccuWeatherClient:
                 "Set ACCUWEATHER_API_KEY in your environment or .env."
             )
 
+        if self.session is None:
+            # One keep-alive session shared by every request (and thread).
+            # Retries (incl. 429 / 5xx, honoring Retry-After) happen inside the
+            # adapter, so the pooled connection is kept across attempts. The
+            # final response is returned rather than raised so _get can report
+            # its status and body. Caller-supplied sessions are left as-is.
+            self.session = requests.Session()
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE
+            )
+            self.session.mount("https://", adapter)
+
     # ---- Internal HTTP helper ------------------------------------------------
 
-    def _get(self, path: str, params: Dict[str, Any], retries: int = 3) -> Any:
+    def _get(self, path: str, params: Dict[str, Any]) -> Any:
         url = f"{ACCU_BASE}{path}"
-        s = self.session or requests.Session()
         params = dict(params or {})
         params["apikey"] = self.api_key
 
-        last_exc: Optional[Exception] = None
-        for attempt in range(1, retries + 1):
-            try:
-                resp = s.get(url, params=params, timeout=self.timeout)
-                if resp.status_code == 200:
-                    return resp.json()
-                raise AccuWeatherError(
-                    f"AccuWeather API error {resp.status_code} for {url} "
-                    f"with params {params}: {resp.text[:500]}"
-                )
-            except (requests.Timeout, requests.ConnectionError) as exc:
-                last_exc = exc
-                if attempt == retries:
-                    break
-                time.sleep(0.75 * attempt)
-        raise AccuWeatherError(f"Network error calling {url}: {last_exc}")
+        try:
+            resp = self.session.get(url, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+        except requests.HTTPError as exc:
+            raise AccuWeatherError(
+                f"AccuWeather API error {resp.status_code} for {url} "
+                f"with params {params}: {resp.text[:500]}"
+            ) from exc
+        except requests.RequestException as exc:
+            raise AccuWeatherError(f"Network error calling {url}: {exc}") from exc
+        # Parse the raw bytes; skips resp.json()'s encoding detection
+        return _json_loads(resp.content)
 
     # ---- Public helpers ------------------------------------------------------
 
@@ -115,6 +242,57 @@ class AccuWeatherClient:
             ) from exc
         return key
 
+    # ---- Location key cache --------------------------------------------------
+
+    def _load_location_key_cache(self) -> Dict[Tuple[float, float], str]:
+        if self._location_key_cache is None:
+            cache: Dict[Tuple[float, float], str] = {}
+            path = Path(self.location_key_cache_path)
+            if path.exists():
+                with open(path) as f:
+                    for coords, key in json.load(f).items():
+                        lat, lon = coords.split(",")
+                        cache[(float(lat), float(lon))] = key
+            self._location_key_cache = cache
+        return self._location_key_cache
+
+    def _save_location_key_cache(self) -> None:
+        path = Path(self.location_key_cache_path)
+        _ensure_dir(path.parent)
+        payload = {
+            f"{lat},{lon}": key for (lat, lon), key in self._location_key_cache.items()
+        }
+        # Write to a temp file then swap, so readers never see a partial file
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    def get_location_key(self, lat: float, lon: float, language: str = "en-us") -> str:
+        """
+        Cached version of get_location_key_by_geoposition. Only hits the API
+        for coordinates that have not been resolved before.
+        """
+        coords = (round(lat, 4), round(lon, 4))
+        with self._location_key_lock:
+            cache = self._load_location_key_cache()
+            if coords in cache:
+                return cache[coords]
+
+        key = self.get_location_key_by_geoposition(lat=lat, lon=lon, language=language)
+
+        with self._location_key_lock:
+            self._location_key_cache[coords] = key
+            self._save_location_key_cache()
+        return key
+
+    def seed_location_keys(self, cities: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Resolve and persist the location_key for every city in `cities`.
+        """
+        for meta in cities.values():
+            self.get_location_key(float(meta["latitude"]), float(meta["longitude"]))
+
     def get_hourly_forecast_12h(
         self,
         location_key: str,
@@ -143,38 +321,26 @@ class AccuWeatherClient:
         details: bool = True,
         language: str = "en-us",
         as_dataframe: bool = True,
-    ) -> Union[List[Dict[str, Any]], "pd.DataFrame"]:
-        location_key = self.get_location_key_by_geoposition(
-            lat=lat, lon=lon, language=language
-        )
+        as_arrow: bool = False,
+    ) -> Union[List[Dict[str, Any]], "pd.DataFrame", pa.Table]:
+        """
+        Returns a pa.Table if as_arrow, else a DataFrame if as_dataframe,
+        else the raw JSON records.
+        """
+        location_key = self.get_location_key(lat=lat, lon=lon, language=language)
         hourly12 = self.get_hourly_forecast_12h(
             location_key, metric=metric, details=details, language=language
         )
 
+        if as_arrow:
+            return _normalize_hourly(hourly12)
+
         if as_dataframe:
             if pd is None:
                 raise AccuWeatherError(
                     "pandas is not installed; set as_dataframe=False to get raw JSON."
                 )
-            df = pd.json_normalize(hourly12)
-            for col_old, col_new in [
-                ("DateTime", "datetime"),
-                ("Temperature.Value", "temp"),
-                ("Temperature.Unit", "temp_unit"),
-                ("RealFeelTemperature.Value", "realfeel"),
-                ("RealFeelTemperature.Unit", "realfeel_unit"),
-                ("IconPhrase", "phrase"),
-                ("HasPrecipitation", "has_precip"),
-                ("PrecipitationProbability", "precip_prob"),
-                ("Wind.Speed.Value", "wind_speed"),
-                ("Wind.Speed.Unit", "wind_unit"),
-                ("Wind.Direction.Localized", "wind_dir"),
-                ("RelativeHumidity", "rh"),
-                ("UVIndex", "uv_index"),
-            ]:
-                if col_old in df.columns:
-                    df.rename(columns={col_old: col_new}, inplace=True)
-            return df
+            return _normalize_hourly(hourly12).to_pandas()
 
         return hourly12
 
@@ -218,7 +384,8 @@ class AccuWeatherClient:
         details: bool = True,
         language: str = "en-us",
         as_dataframe: bool = True,
-    ) -> Union[List[Dict[str, Any]], "pd.DataFrame"]:
+        as_arrow: bool = False,
+    ) -> Union[List[Dict[str, Any]], "pd.DataFrame", pa.Table]:
         """
         Convenience: city name -> lat/lon (from city_reference.py) -> 12h forecast.
         """
@@ -230,6 +397,7 @@ class AccuWeatherClient:
             details=details,
             language=language,
             as_dataframe=as_dataframe,
+            as_arrow=as_arrow,
         )
 
     def get_hourly_forecast_12h_all_cities(
@@ -255,37 +423,47 @@ class AccuWeatherClient:
         frames: List[pd.DataFrame] = []
         failures: Dict[str, str] = {}
 
-        for city, meta in CITY_REFERENCE.items():
-            try:
-                df = self.get_hourly_forecast_12h_by_city(
-                    city_name=city,
-                    metric=metric,
-                    details=details,
-                    language=language,
-                    as_dataframe=True,
-                )
-                # Tag with city + coordinates
-                df["city"] = city
-                df["latitude"] = float(meta.get("latitude"))
-                df["longitude"] = float(meta.get("longitude"))
-
-                # Optional: attach your other city_reference metadata
-                if include_city_meta:
-                    for k in ("series_id", "nws_id", "tz_convert", "weather_id"):
-                        if k in meta:
-                            df[k] = meta[k]
-
-                # Optional: Fahrenheit column alongside whatever unit came back
-                if add_fahrenheit and "temp" in df and "temp_unit" in df:
-                    if str(df["temp_unit"].iloc[0]).upper() == "C":
-                        df["temp_f"] = df["temp"] * 9.0 / 5.0 + 32.0
-                    else:
-                        df["temp_f"] = df["temp"]
-
-                frames.append(df)
-
-            except Exception as exc:
-                failures[city] = str(exc)
+        def fetch_city(city: str, meta: Dict[str, Any]) -> pd.DataFrame:
+            df = self.get_hourly_forecast_12h_by_city(
+                city_name=city,
+                metric=metric,
+                details=details,
+                language=language,
+                as_dataframe=True,
+            )
+            # Tag with city + coordinates
+            df["city"] = city
+            df["latitude"] = float(meta.get("latitude"))
+            df["longitude"] = float(meta.get("longitude"))
+
+            # Optional: attach your other city_reference metadata
+            if include_city_meta:
+                for k in ("series_id", "nws_id", "tz_convert", "weather_id"):
+                    if k in meta:
+                        df[k] = meta[k]
+
+            # Optional: Fahrenheit column alongside whatever unit came back
+            if add_fahrenheit and "temp" in df:
+                if metric:
+                    df["temp_f"] = _celsius_to_fahrenheit(df["temp"])
+                else:
+                    df["temp_f"] = df["temp"]
+
+            return df
+
+        # Cities run concurrently on the client session; one failure is recorded
+        # without cancelling the rest
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            futures = {
+                ex.submit(fetch_city, city, meta): city
+                for city, meta in CITY_REFERENCE.items()
+            }
+            for future in as_completed(futures):
+                city = futures[future]
+                try:
+                    frames.append(future.result())
+                except Exception as exc:
+                    failures[city] = str(exc)
 
         if not frames:
             raise AccuWeatherError(f"All city fetches failed: {failures}")
@@ -308,9 +486,12 @@ class AccuWeatherClient:
         return out
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _slugify(value: str) -> str:
     value = value.strip().lower()
-    value = re.sub(r"[^a-z0-9]+", "_", value)
+    value = _SLUG_RE.sub("_", value)
     return value.strip("_")
 
 
@@ -337,10 +518,11 @@ def stage_accuweather_12h_all_cities(
 ) -> pd.DataFrame:
     """
     Fetch 12-hour AccuWeather forecasts for all cities in CITY_REFERENCE,
-    annotate with metadata, and save one parquet per city into `output_dir`.
+    annotate with metadata, and save them as a Hive-partitioned parquet
+    dataset (city=<name>/date=<YYYY-MM-DD>/...) under `output_dir`.
 
     Args:
-        output_dir: Folder to write staged parquet files (one per city per run).
+        output_dir: Root of the staged parquet dataset (one file per city per run).
         metric: If False, API returns Fahrenheit directly; if True, Celsius.
         details: Pass-through for AccuWeather details payload.
         language: API language code.
@@ -359,66 +541,93 @@ def stage_accuweather_12h_all_cities(
 
     timestamp = datetime.now(timezone.utc)
     ts_str = timestamp.strftime("%Y%m%d_%H%M%S")
+    date_str = timestamp.strftime("%Y-%m-%d")
 
-    frames: List[pd.DataFrame] = []
+    tables: Dict[str, pa.Table] = {}
     failures: Dict[str, str] = {}
 
-    for city, meta in CITY_REFERENCE.items():
-        try:
-            df = client.get_hourly_forecast_12h_by_city(
-                city_name=city,
-                metric=metric,
-                details=details,
-                language=language,
-                as_dataframe=True,
-            )
-
-            # Ensure datetime dtype
-            if "datetime" in df.columns:
-                df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
+    def stage_city(city: str, meta: Dict[str, Any]) -> pa.Table:
+        # Stays in Arrow end to end; columns are appended, never copied
+        table = client.get_hourly_forecast_12h_by_city(
+            city_name=city,
+            metric=metric,
+            details=details,
+            language=language,
+            as_arrow=True,
+        )
+        n = table.num_rows
 
-            # Add standardized columns used by your aggregator
-            df["forecast_temperature"] = df.get("temp")
-            df["city"] = city
-            df["model_timestamp"] = timestamp
-            df["model_name"] = model_name
-            df["model_id"] = model_id
+        def constant(value: Any, ty: Optional[pa.DataType] = None) -> pa.Array:
+            return pa.array([value] * n, type=ty)
 
-            # Include coordinates + other metadata from city_reference
-            df["latitude"] = float(meta.get("latitude"))
-            df["longitude"] = float(meta.get("longitude"))
-            if include_city_meta:
-                for k in ("series_id", "nws_id", "tz_convert", "weather_id"):
-                    if k in meta:
-                        df[k] = meta[k]
-
-            # Optional Fahrenheit alongside whatever the API returned
-            if add_fahrenheit and "temp" in df and "temp_unit" in df:
-                if str(df["temp_unit"].iloc[0]).upper() == "C":
-                    df["temp_f"] = df["temp"] * 9.0 / 5.0 + 32.0
-                else:
-                    df["temp_f"] = df["temp"]
+        # Add standardized columns used by your aggregator
+        table = table.append_column("forecast_temperature", table.column("temp"))
+        table = table.append_column("city", constant(city))
+        table = table.append_column(
+            "model_timestamp", constant(timestamp, pa.timestamp("us", "UTC"))
+        )
+        table = table.append_column("model_name", constant(model_name))
+        table = table.append_column("model_id", constant(model_id))
 
-            # File per city
-            city_slug = _slugify(city)
-            fname = f"accuweather_12h_{city_slug}_{ts_str}.parquet"
-            fpath = out_path / fname
-            df.to_parquet(fpath, index=False)
-            if verbose:
-                print(f"Saved {city}: {fpath}")
+        # Include coordinates + other metadata from city_reference
+        table = table.append_column(
+            "latitude", constant(float(meta.get("latitude")), pa.float64())
+        )
+        table = table.append_column(
+            "longitude", constant(float(meta.get("longitude")), pa.float64())
+        )
+        if include_city_meta:
+            for k in ("series_id", "nws_id", "tz_convert", "weather_id"):
+                if k in meta:
+                    table = table.append_column(k, constant(meta[k]))
+
+        # Optional Fahrenheit alongside whatever the API returned
+        if add_fahrenheit:
+            if metric:
+                temp_f = pa.array(_celsius_to_fahrenheit(table.column("temp")))
+            else:
+                temp_f = table.column("temp")
+            table = table.append_column("temp_f", temp_f)
 
-            frames.append(df)
+        return table
 
-        except Exception as exc:  # noqa: BLE001
-            failures[city] = str(exc)
-            if verbose:
-                print(f"FAILED {city}: {exc}")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {
+            ex.submit(stage_city, city, meta): city
+            for city, meta in CITY_REFERENCE.items()
+        }
+        for future in as_completed(futures):
+            city = futures[future]
+            try:
+                tables[city] = future.result()
+            except Exception as exc:  # noqa: BLE001
+                failures[city] = str(exc)
+                if verbose:
+                    print(f"FAILED {city}: {exc}")
 
-    if not frames:
+    if not tables:
         msg = f"All city fetches failed: {failures}" if failures else "No cities found."
         raise AccuWeatherError(msg)
 
-    result = pd.concat(frames, ignore_index=True)
+    result = pa.concat_tables(
+        list(tables.values()), promote_options="default"
+    ).to_pandas()
+
+    # city/date live in the directory names so DuckDB can prune whole files,
+    # and city stays in the file too so each one still reads on its own. The
+    # directory carries the real city name: DuckDB prefers the partition value
+    # over the file column, so a slug would change the city values read back.
+    for city, table in tables.items():
+        city_dir = out_path / f"city={city}" / f"date={date_str}"
+        _ensure_dir(city_dir)
+        pq.write_table(
+            table,
+            city_dir / f"accuweather_12h_{_slugify(city)}_{ts_str}.parquet",
+            compression="zstd",
+            row_group_size=ROWS_PER_GROUP,
+        )
+    if verbose:
+        print(f"Saved {len(tables)} city(ies): {out_path}")
 
     if verbose and failures:
         print(f"Note: {len(failures)} city(ies) failed -> {failures}")
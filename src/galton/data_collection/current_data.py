@@ -1,34 +1,108 @@
+import functools
+import os
+
+from pathlib import Path
+from typing import Union
+
 import pandas as pd
+import pyarrow as pa
 import duckdb
 
 
-def load_current_data(
-    dataset_name: str, start_date_field: str, n_latest_dates: int
-) -> pd.DataFrame:
+@functools.cache
+def _connection() -> duckdb.DuckDBPyConnection:
+    # One in-memory database per process; keep parquet footers cached
+    # between queries instead of re-reading them on every call.
+    con = duckdb.connect(":memory:", config={"threads": os.cpu_count() or 1})
+    con.execute("PRAGMA enable_object_cache")
+    return con
+
 
-    con = duckdb.connect()
+def _dataset_path(dataset_name: str) -> Path:
+    return Path(f"data/local_data/{dataset_name}")
 
-    con.execute(
+
+@functools.lru_cache(maxsize=64)
+def _register(dataset_name: str) -> None:
+    _connection().execute(
         f"""
         CREATE OR REPLACE VIEW {dataset_name} AS
         SELECT *
-        FROM read_parquet('data/local_data/{dataset_name}/**/*.parquet');
+        FROM read_parquet('{_dataset_path(dataset_name)}/**/*.parquet');
     """
     )
 
-    query = f"""
-    WITH latest_dates AS (
-        SELECT DISTINCT {start_date_field}
-        FROM {dataset_name}
-        ORDER BY {start_date_field} DESC
-        LIMIT {n_latest_dates}
-    )
-    SELECT f.*
-    FROM {dataset_name} f
-    JOIN latest_dates d
-    USING ({start_date_field})
+
+# Directory name used for NULL partition values
+_HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _latest_partition_values(
+    dataset_path: Path, partition_field: str, n_latest_dates: int
+) -> list[str]:
+    # Hive partition values are encoded in directory names, so the latest
+    # ones can be found without opening a single parquet file.
+    values = {
+        p.name.split("=", 1)[1]
+        for p in dataset_path.glob(f"**/{partition_field}=*")
+        if p.is_dir()
+    }
+    values.discard(_HIVE_NULL_PARTITION)
+    return sorted(values, reverse=True)[:n_latest_dates]
+
+
+def load_current_data(
+    dataset_name: str,
+    start_date_field: str,
+    n_latest_dates: int,
+    as_arrow: bool = False,
+    arrow_backed: bool = False,
+) -> Union[pd.DataFrame, pa.Table]:
     """
+    Load the rows for the `n_latest_dates` most recent values of
+    `start_date_field` from a local parquet dataset.
 
-    con.execute(query)
-    df_current = con.fetch_df()
+    Results come back from DuckDB as an Arrow table. With as_arrow=True it is
+    returned as-is; otherwise it is converted to pandas, backed by Arrow
+    memory (pd.ArrowDtype, no copy) when arrow_backed=True.
+    """
+
+    _register(dataset_name)
+
+    latest = _latest_partition_values(
+        _dataset_path(dataset_name), start_date_field, n_latest_dates
+    )
+
+    if latest:
+        # Partition column: filter on it directly so DuckDB prunes whole files.
+        # Values are bound as parameters and compared in their directory-name
+        # (text) form, whatever type DuckDB infers for the partition column.
+        placeholders = ", ".join("?" for _ in latest)
+        query = f"""
+        SELECT *
+        FROM {dataset_name}
+        WHERE CAST({start_date_field} AS VARCHAR) IN ({placeholders})
+        """
+        params = latest
+    else:
+        # Regular column: rank dates in a single scan instead of a self-join
+        query = f"""
+        SELECT *
+        FROM {dataset_name}
+        QUALIFY dense_rank() OVER (ORDER BY {start_date_field} DESC) <= {n_latest_dates}
+        """
+        params = None
+
+    # A cursor shares the cached database (views, object cache) but is safe to
+    # use independently of other callers; it is closed once fetched.
+    with _connection().cursor() as con:
+        table = con.execute(query, params).fetch_arrow_table()
+    if as_arrow:
+        return table
+
+    df_current = table.to_pandas(
+        types_mapper=pd.ArrowDtype if arrow_backed else None,
+        split_blocks=True,
+        self_destruct=True,
+    )
     return df_current
@@ -1,5 +1,6 @@
 import re
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
+from itertools import product
 from typing import Iterable, Optional
 
 
@@ -75,11 +76,14 @@ def enumerate_date_range(
     if start > end:
         return []
 
-    num_days = (end - start).days + 1
-    return [
-        _format_date(start + timedelta(days=i), start_date_format)
-        for i in range(num_days)
-    ]
+    days = map(date.fromordinal, range(start.toordinal(), end.toordinal() + 1))
+
+    # Numeric formats are built directly; strftime is only needed for month names
+    if start_date_format == "YYYY-MM-DD":
+        return [f"{d.year:04d}-{d.month:02d}-{d.day:02d}" for d in days]
+    if start_date_format == "YYYYMMDD":
+        return [f"{d.year:04d}{d.month:02d}{d.day:02d}" for d in days]
+    return [_format_date(d, start_date_format) for d in days]
 
 
 def build_file_stem_candidates(
@@ -106,9 +110,7 @@ def build_file_stem_candidates(
     if not dates_list:
         return []
 
-    return [
-        f"{prefix}{d}{suffix}"
-        for prefix in prefixes_list
-        for d in dates_list
-        for suffix in suffixes_list
-    ]
+    if suffixes_list == [""]:
+        return [prefix + d for prefix in prefixes_list for d in dates_list]
+
+    return list(map("".join, product(prefixes_list, dates_list, suffixes_list)))
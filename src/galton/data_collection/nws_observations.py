@@ -1,47 +1,72 @@
 from __future__ import annotations
 
+import lxml.html
 import pandas as pd
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 from galton.data_collection.city_reference import cities
 from galton.data_collection.utilities import save, get_current_timestamp
 
 
+NWS_HISTORY_URL = "https://forecast.weather.gov/data/obhistory/K{nws_id}.html"
+
+
 def read_nws_table(
     nws_id,
+    session,
     column_numbers=[0, 1, 2, 4, 6, 8],
     column_names=["date", "time", "wind", "weather", "air", "6_hour_max"],
 ):
 
-    df = pd.read_html(f"https://forecast.weather.gov/data/obhistory/K{nws_id}.html")[0]
-
-    # Select columns by column number
-    df_selected = df.iloc[:, column_numbers]
+    resp = session.get(NWS_HISTORY_URL.format(nws_id=nws_id), timeout=(5, 20))
+    resp.raise_for_status()
 
-    # Rename Columns
-    new_column_names = column_names
-    df_selected.columns = new_column_names
+    # Pull only the wanted cells straight from the first table on the page
+    table = lxml.html.fromstring(resp.text).xpath("//table")[0]
+    cols = [[] for _ in column_numbers]
+    for row in table.xpath(".//tr"):
+        tds = [td.text_content().strip() for td in row.xpath("./td")]
 
-    # Remove Footer
-    filtered_df = df_selected[~df_selected["date"].str.contains("Date", na=False)]
-    filtered_df = filtered_df.reset_index(drop=True)
+        # Skip header (th-only) and footer rows
+        if not tds or tds[0].startswith("Date"):
+            continue
 
-    return filtered_df
+        for i, idx in enumerate(column_numbers):
+            cols[i].append((tds[idx] or None) if idx < len(tds) else None)
 
+    return pd.DataFrame(dict(zip(column_names, cols)))
 
-def get_nws_data(cities):
 
-    all_cities_df = pd.DataFrame()
+def get_nws_data(cities, max_workers=8):
 
-    for city in cities.keys():
+    def fetch_city(city):
         nws_id = cities[city]["nws_id"]
 
         current_timestamp = get_current_timestamp()
-        nws_update = read_nws_table(nws_id)
+        nws_update = read_nws_table(nws_id, session)
 
         nws_update["timestamp"] = current_timestamp
         nws_update["city"] = city
 
-        all_cities_df = pd.concat([all_cities_df, nws_update]).reset_index(drop=True)
+        return nws_update, current_timestamp
+
+    # One keep-alive session shared by every worker thread, closed once all
+    # pages are in. Each station page is its own download, so they are
+    # fetched side by side rather than one after another.
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(cities))
+        session.mount("https://", adapter)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            results = list(ex.map(fetch_city, cities))
+
+    frames = [nws_update for nws_update, _ in results]
+    current_timestamp = max(ts for _, ts in results)
+
+    all_cities_df = pd.concat(frames, ignore_index=True)
 
     save(
         all_cities_df,
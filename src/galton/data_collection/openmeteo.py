@@ -1,51 +1,77 @@
+import functools
+import numpy as np
 import openmeteo_requests
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytz
 import requests_cache
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from retry_requests import retry
 from datetime import datetime
 
 from galton.data_collection.city_reference import cities
-from galton.data_collection.utilities import save, get_current_timestamp
+from galton.data_collection.utilities import (
+    PARQUET_COMPRESSION,
+    PARQUET_COMPRESSION_LEVEL,
+    build_file_path,
+    get_current_timestamp,
+)
 
 
+@functools.lru_cache(maxsize=1)
 def connect_to_openmeteo():
-    cache_session = requests_cache.CachedSession(".cache", expire_after=300)
+    # Built once per process. Model output updates hourly at most, so a 30 min
+    # cache is still fresh; fall back to cached data if upstream errors.
+    cache_session = requests_cache.CachedSession(
+        ".cache", expire_after=1800, stale_if_error=True
+    )
     retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
     openmeteo = openmeteo_requests.Client(session=retry_session)
 
     return openmeteo
 
 
+# Immutable request template; only location and horizon vary per city
+_MODELS = (
+    "best_match",
+    "ecmwf_ifs04",
+    "ecmwf_ifs025",
+    "ecmwf_aifs025",
+    "gfs_global",
+    "gfs_hrrr",
+    "ncep_nbm_conus",
+    "gfs_graphcast025",
+    "jma_gsm",
+    "icon_global",
+    "gem_global",
+    "gem_regional",
+    "meteofrance_arpege_world",
+    "ukmo_global_deterministic_10km",
+)
+
+_BASE_PARAMS = {
+    "forecast_days": 3,
+    "current": "temperature_2m",
+    "hourly": ("temperature_2m",),
+    "temperature_unit": "fahrenheit",
+    "models": _MODELS,
+}
+
+
 def update_multi_model_forecast_params(cities, city, forecast_days):
 
-    latitude = cities[city]["latitude"]
-    longitude = cities[city]["longitude"]
+    c = cities[city]
 
     params = {
-        "latitude": latitude,
-        "longitude": longitude,
+        **_BASE_PARAMS,
+        "latitude": c["latitude"],
+        "longitude": c["longitude"],
         "forecast_days": forecast_days,
-        "current": "temperature_2m",
-        "hourly": ["temperature_2m"],
-        "temperature_unit": "fahrenheit",
-        "models": [
-            "best_match",
-            "ecmwf_ifs04",
-            "ecmwf_ifs025",
-            "ecmwf_aifs025",
-            "gfs_global",
-            "gfs_hrrr",
-            "ncep_nbm_conus",
-            "gfs_graphcast025",
-            "jma_gsm",
-            "icon_global",
-            "gem_global",
-            "gem_regional",
-            "meteofrance_arpege_world",
-            "ukmo_global_deterministic_10km",
-        ],
     }
 
     return params
@@ -57,91 +83,183 @@ def update_multi_model_forecast_params(cities, city, forecast_days):
 #     return current_timestamp
 
 
-def add_multi_model_metadata(
-    forecast_update, city, model_timestamp, current_timestamp, model_name, model_id
-):
+def _constant_column(value, n_rows, categories=None, ty=None):
+    # Fixed category sets (dictionary encoding) keep concat and the written
+    # parquet on int codes instead of repeated strings
+    if categories is None:
+        return pa.array([value] * n_rows, type=ty)
+    indices = pa.array(np.full(n_rows, categories.index(value), dtype=np.int32))
+    return pa.DictionaryArray.from_arrays(indices, pa.array(categories))
+
+
+def extract_vars(hourly, n_vars):
+    # All hourly variables in one contiguous float32 block, one row per
+    # variable, so each column is a zero-copy view of the same buffer
+    return np.stack(
+        [hourly.Variables(i).ValuesAsNumpy() for i in range(n_vars)], axis=0
+    ).astype(np.float32, copy=False)
+
+
+# Parsed per-model tables, keyed by what makes a response unique. Runs between
+# model releases return identical data, so re-parsing it is skipped.
+_PARSED_CACHE_SIZE = 256
+_parsed_cache = OrderedDict()
+_parsed_cache_lock = threading.Lock()
+
 
-    forecast_update["city"] = city
-    forecast_update["model_timestamp"] = model_timestamp
-    forecast_update["current_timestamp"] = current_timestamp
-    forecast_update["model_name"] = model_name
-    forecast_update["model_id"] = model_id
+def _build_model_table(response, params, city, city_categories, model_name):
+    model_id = response.Model()
 
-    return forecast_update
+    current = response.Current()
+    model_timestamp = pd.Timestamp(current.Time(), unit="s", tz="UTC").tz_convert(
+        "US/Central"
+    )
+
+    hourly = response.Hourly()
+    hourly_values = extract_vars(hourly, len(params["hourly"]))
+
+    # The response is already a uniform grid of Unix seconds
+    seconds = np.arange(
+        hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype="int64"
+    )
+    forecast_dates = pd.to_datetime(seconds, unit="s", utc=True).tz_convert(
+        "US/Central"
+    )
+    n_rows = len(forecast_dates)
+
+    # Every per-model table has the same schema, so they concatenate as a
+    # plain list of chunks with no pandas block reconciliation
+    forecast_date = pa.array(forecast_dates)
+    hourly_columns = {"forecast_date": forecast_date}
+    for i, variable in enumerate(params["hourly"]):
+        hourly_columns[variable] = pa.array(hourly_values[i])
+    return pa.Table.from_pydict(
+        {
+            **hourly_columns,
+            "city": _constant_column(city, n_rows, city_categories),
+            # Same unit as forecast_date so their difference keeps its unit
+            "model_timestamp": _constant_column(
+                model_timestamp, n_rows, ty=forecast_date.type
+            ),
+            "model_name": _constant_column(model_name, n_rows, list(params["models"])),
+            "model_id": _constant_column(model_id, n_rows, ty=pa.int32()),
+        }
+    )
 
 
-def parse_multi_model_response(responses, params, city):
+def _cached_model_table(response, params, city, city_categories, model_name):
+    key = (
+        city,
+        tuple(params["models"]),
+        tuple(params["hourly"]),
+        params["forecast_days"],
+        model_name,
+        response.Model(),
+        response.Current().Time(),
+    )
+    with _parsed_cache_lock:
+        if key in _parsed_cache:
+            _parsed_cache.move_to_end(key)
+            return _parsed_cache[key]
+
+    table = _build_model_table(response, params, city, city_categories, model_name)
+
+    with _parsed_cache_lock:
+        _parsed_cache[key] = table
+        if len(_parsed_cache) > _PARSED_CACHE_SIZE:
+            _parsed_cache.popitem(last=False)
+    return table
+
+
+def parse_multi_model_response(responses, params, city, city_categories=None):
     current_timestamp = get_current_timestamp()
-    hourly_df = pd.DataFrame()
+    tables = []
     for model in range(len(responses)):
 
         response = responses[model]
-        model_id = response.Model()
-
         model_name = params["models"][model]
 
-        current = response.Current()
-        model_timestamp = pd.to_datetime(current.Time(), unit="s", utc=True).tz_convert(
-            "US/Central"
+        model_table = _cached_model_table(
+            response, params, city, city_categories, model_name
         )
 
-        hourly = response.Hourly()
-        hourly_temperature_2m = hourly.Variables(0).ValuesAsNumpy()
-
-        hourly_data = {
-            "forecast_date": pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s", utc=True).tz_convert(
-                    "US/Central"
-                ),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True).tz_convert(
-                    "US/Central"
-                ),
-                freq=pd.Timedelta(seconds=hourly.Interval()),
-                inclusive="left",
-            )
-        }
+        # current_timestamp is the only field that changes between runs
+        hourly_table = model_table.add_column(
+            model_table.schema.get_field_index("model_name"),
+            "current_timestamp",
+            _constant_column(current_timestamp, model_table.num_rows),
+        )
 
-        hourly_data["temperature_2m"] = hourly_temperature_2m
+        tables.append(hourly_table)
 
-        hourly_dataframe = pd.DataFrame(data=hourly_data)
-        hourly_dataframe = add_multi_model_metadata(
-            hourly_dataframe,
-            city,
-            model_timestamp,
-            current_timestamp,
-            model_name,
-            model_id,
-        )
+    if len(tables) == 1:
+        hourly_table = tables[0]
+    else:
+        hourly_table = pa.concat_tables(tables)
+    return hourly_table, current_timestamp
 
-        hourly_df = pd.concat([hourly_df, hourly_dataframe])
 
-    return hourly_df, current_timestamp
+def fetch_city(openmeteo, forecast_url, cities, city):
+    multi_model_forecast_params = update_multi_model_forecast_params(
+        cities, city, forecast_days=3
+    )
+    responses = openmeteo.weather_api(forecast_url, params=multi_model_forecast_params)
+    hourly_table, _ = parse_multi_model_response(
+        responses,
+        params=multi_model_forecast_params,
+        city=city,
+        city_categories=list(cities.keys()),
+    )
+    return hourly_table
 
 
-def get_multi_model_forecast(cities):
+def get_multi_model_forecast(cities, max_workers=8):
 
     openmeteo = connect_to_openmeteo()
 
     forecast_url = "https://api.open-meteo.com/v1/forecast"
 
-    request_count = 0
-    all_cities_df = pd.DataFrame()
-    for city in cities.keys():
-        multi_model_forecast_params = update_multi_model_forecast_params(
-            cities, city, forecast_days=3
-        )
-        responses = openmeteo.weather_api(
-            forecast_url, params=multi_model_forecast_params
-        )
-        request_count += 1
-        hourly_df, current_timestamp = parse_multi_model_response(
-            responses, params=multi_model_forecast_params, city=city
-        )
-        all_cities_df = pd.concat([all_cities_df, hourly_df])
-
-    save(
-        all_cities_df,
+    # The file is opened before any city finishes, so it is named after the
+    # start of the run
+    full_path = build_file_path(
         path=f"data/staging/openmeteo_forecasts",
         file_name="multi_model_forecasts",
-        current_timestamp=current_timestamp,
+        current_timestamp=get_current_timestamp(),
     )
+
+    # Requests are network bound, so overlap them across cities. The cached
+    # session is shared by every worker. Each finished city is appended to a
+    # temp file as its own row group and its future dropped, so the writer
+    # never collects the whole run. The per-model tables themselves stay in
+    # _parsed_cache for the next run. The file only takes its real name once
+    # every city has succeeded.
+    tmp_path = f"{full_path}.tmp"
+    writer = None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            pending = {
+                ex.submit(fetch_city, openmeteo, forecast_url, cities, city)
+                for city in cities.keys()
+            }
+            for future in as_completed(pending):
+                pending.discard(future)
+                hourly_table = future.result()
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        tmp_path,
+                        hourly_table.schema,
+                        compression=PARQUET_COMPRESSION,
+                        compression_level=PARQUET_COMPRESSION_LEVEL,
+                    )
+                writer.write_table(hourly_table)
+                del future, hourly_table
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, full_path)
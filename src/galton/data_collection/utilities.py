@@ -1,23 +1,28 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytz
 
 from datetime import datetime
 from typing import Optional
 
 
-def save(
-    df: pd.DataFrame,
+# Compression used for every staged parquet file
+PARQUET_COMPRESSION = "zstd"
+PARQUET_COMPRESSION_LEVEL = 3
+
+
+def build_file_path(
     path: str,
     file_name: str,
     current_timestamp: Optional[datetime] = None,
-) -> None:
+) -> str:
     """
-    Save a DataFrame to a Parquet file with an optional timestamp appended.
+    Build the full Parquet file path used by `save`, with an optional
+    timestamp appended to the file name.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        The dataframe to save.
     path : str
         The directory or base path where the file will be saved.
     file_name : str
@@ -31,28 +36,53 @@ def save(
     base = f"{path}/{file_name}"
 
     if current_timestamp:
-        # Format datetime safely for file names
-        # Example: 2025-11-03T22-26-40.645330
-        dt_str = current_timestamp.isoformat()
-
-        # Replace illegal filename characters
-        dt_str = (
-            dt_str.replace(":", "-")
-            .replace("+", "_plus_")
-            .replace("-", "_")  # first replace creates conflicts; we handle below
-        )
-
-        # Fix date hyphens (turn back into hyphens for readability)
-        # year_month_day portion is safe
-        dt_str = dt_str.replace("_", "-", 2)  # only fix first two segments
+        # Format datetime safely for file names in one pass
+        # Example: 2025-11-03T22-26-40.645330_minus0600
+        dt_str = current_timestamp.strftime("%Y-%m-%dT%H-%M-%S.%f")
+        if current_timestamp.tzinfo is not None:
+            offset = current_timestamp.strftime("%z")  # e.g. "-0600"
+            sign = "plus" if offset[0] == "+" else "minus"
+            dt_str = f"{dt_str}_{sign}{offset[1:]}"
 
         # Append to base path
         base = f"{base}--{dt_str}"
 
     # Always use .parquet extension
-    full_path = f"{base}.parquet"
+    return f"{base}.parquet"
 
-    df.to_parquet(full_path)
+
+def save(
+    df: pd.DataFrame,
+    path: str,
+    file_name: str,
+    current_timestamp: Optional[datetime] = None,
+) -> None:
+    """
+    Save a DataFrame to a Parquet file with an optional timestamp appended.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to save.
+    path : str
+        The directory or base path where the file will be saved.
+    file_name : str
+        The base name of the file (without extension).
+    current_timestamp : datetime, optional
+        A datetime object whose timestamp and timezone (if provided)
+        will be sanitized and appended to the file name.
+    """
+
+    full_path = build_file_path(path, file_name, current_timestamp)
+
+    # zstd without the pandas index; string columns are dictionary encoded
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table,
+        full_path,
+        compression=PARQUET_COMPRESSION,
+        compression_level=PARQUET_COMPRESSION_LEVEL,
+    )
 
 
 def normalize_field_names(df):
@@ -83,8 +113,15 @@ def convert_datetime_to_utc(
 
     Example input: '2025-09-14 00:00:00-05:00'
     """
-    df = df.copy()  # avoid mutating caller’s df
-    df["datetime_utc"] = pd.to_datetime(df[col], utc=True).dt.tz_convert("UTC")
+    values = df[col]
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        # Already tz-aware; skip the element-wise parse
+        datetime_utc = values.dt.tz_convert("UTC")
+    else:
+        datetime_utc = pd.to_datetime(values, utc=True)
+
+    # assign() leaves the caller's df untouched without deep-copying it
+    df = df.assign(datetime_utc=datetime_utc)
     if drop_col:
         df = df.drop(columns=[col])
     return df
@@ -1,27 +1,19 @@
-import pandas as pd
+from galton.data_collection.utilities import convert_datetime_to_utc
 
-
-def convert_datetime_to_utc(
-    df: pd.DataFrame, col: str = "datetime", drop_col: bool = False
-) -> pd.DataFrame:
-    """
-    Convert a dataframe column with timezone-aware datetimes
-    to UTC and rename it to 'datetime_utc'.
-
-    Example input: '2025-09-14 00:00:00-05:00'
-    """
-    df = df.copy()  # avoid mutating caller’s df
-    df["datetime_utc"] = pd.to_datetime(df[col], utc=True).dt.tz_convert("UTC")
-    if drop_col:
-        df = df.drop(columns=[col])
-    return df
+__all__ = ["convert_datetime_to_utc", "add_date_fields"]
 
 
 def add_date_fields(df):
-    df["date"] = df["datetime"].dt.strftime("%Y-%m-%d")
+    dt = df["datetime"].dt
 
-    df["month"] = df["date"].str[5:7]  # use string slice for consistency
-    df["year"] = df["date"].str[:4]
-    df["year_month"] = df["year"] + "-" + df["month"]
+    # 'date' stays a string: it is a record index field matched against
+    # previously stored data. year/month come straight from the datetime64
+    # buffer instead of slicing that string.
+    df["date"] = dt.strftime("%Y-%m-%d")
+    df["year"] = dt.year.astype("int16")
+    df["month"] = dt.month.astype("int8")
+    df["year_month"] = (
+        df["year"].astype(str) + "-" + df["month"].astype(str).str.zfill(2)
+    )
 
     return df
@@ -2,16 +2,24 @@ import pandas as pd
 import numpy as np
 
 
+def _local_day_number(s):
+    # Days since epoch of the wall-clock date (what .dt.date would give),
+    # as int64 instead of an object array of datetime.date
+    if s.dt.tz is not None:
+        s = s.dt.tz_localize(None)
+    return s.to_numpy().astype("datetime64[D]").astype("int64")
+
+
 def add_forecast_fields(df):
     df["forecast_horizon"] = df["datetime"] - df["model_timestamp"]
-    df["forecast_horizon_hours"] = df["forecast_horizon"].dt.total_seconds() / 3600
+    df["forecast_horizon_hours"] = (
+        df["forecast_horizon"].dt.total_seconds() / 3600
+    ).astype("float32")
 
-    df["is_model_timestamp_prior_day"] = (
-        df["model_timestamp"].dt.date == (df["datetime"] - pd.Timedelta(days=1)).dt.date
-    )
-    df["is_model_timestamp_same_day"] = (
-        df["model_timestamp"].dt.date == (df["datetime"] - pd.Timedelta(days=0)).dt.date
-    )
+    dt_day = _local_day_number(df["datetime"])
+    mt_day = _local_day_number(df["model_timestamp"])
+    df["is_model_timestamp_prior_day"] = mt_day == (dt_day - 1)
+    df["is_model_timestamp_same_day"] = mt_day == dt_day
     return df
 
 
@@ -34,7 +42,9 @@ def add_forecast_fields(df):
 
 
 def filter_redundant_forecasts(df):
-    filtered_df = df[df["datetime"] > df["model_timestamp"]]
+    # Compare the raw datetime64 buffers, then gather the kept rows once
+    mask = df["datetime"].values > df["model_timestamp"].values
+    filtered_df = df.iloc[np.flatnonzero(mask)]
     deduped_df = filtered_df.drop_duplicates(
         subset=[
             "datetime",
@@ -49,10 +59,20 @@ def filter_redundant_forecasts(df):
     return deduped_df.reset_index(drop=True)
 
 
+def _not_equal(s, value):
+    # Compare categorical int codes rather than strings when possible
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        categories = s.cat.categories
+        if value not in categories:
+            return np.ones(len(s), dtype=bool)
+        return s.cat.codes.to_numpy() != categories.get_loc(value)
+    return s.to_numpy() != value
+
+
 def filter_unused_forecast_data(df):
     mask = (
-        df["forecast_temperature"].notna()
-        & (df["city"] != "Houston")
-        & (df["model_name"] != "best_match")
+        df["forecast_temperature"].notna().to_numpy()
+        & _not_equal(df["city"], "Houston")
+        & _not_equal(df["model_name"], "best_match")
     )
-    return df[mask].reset_index(drop=True)
+    return df.iloc[np.flatnonzero(mask)].reset_index(drop=True)